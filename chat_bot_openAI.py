@@ -1,10 +1,26 @@
 import os
 import json
+import asyncio
+import hashlib
+import re
+import threading
+import time
 import arxiv
+import httpx
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient
+
+import orjson
+
+from chat_utils import assistant_message_dict
+
+
+def _json_dumps(obj, indent: bool = False) -> str:
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
 
 # === Load environment ===
 load_dotenv()
@@ -14,69 +30,249 @@ AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-03-01-preview")
 
 # === OpenAI client ===
-client = AzureOpenAI(
+# One shared client with an explicit keep-alive pool, so concurrent requests
+# reuse open connections instead of paying a TCP/TLS handshake each time.
+client = AsyncAzureOpenAI(
     api_key=AZURE_OPENAI_API_KEY,
     api_version=AZURE_OPENAI_API_VERSION,
-    azure_endpoint=AZURE_OPENAI_ENDPOINT
+    azure_endpoint=AZURE_OPENAI_ENDPOINT,
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+    )
 )
 
 # === Global paper storage ===
 PAPER_DIR = "papers"
 Path(PAPER_DIR).mkdir(exist_ok=True)
 
-def search_papers(topic: str, max_results: int = 5) -> List[str]:
+# === arXiv API ===
+ARXIV_MAX_PAGE_SIZE = 2000
+
+@lru_cache(maxsize=8)
+def _arxiv_client(page_size: int) -> arxiv.Client:
     """
-    Search arXiv for papers matching a topic and save the info.
+    Shared arxiv client per page size, so its HTTP session (and rate limiting)
+    persists across searches.
     """
-    client_arxiv = arxiv.Client()
-    search = arxiv.Search(query=topic, max_results=max_results, sort_by=arxiv.SortCriterion.Relevance)
-    results = client_arxiv.results(search)
+    return arxiv.Client(page_size=page_size, delay_seconds=3, num_retries=3)
 
-    topic_dir = Path(PAPER_DIR) / topic.lower().replace(" ", "_")
-    topic_dir.mkdir(parents=True, exist_ok=True)
-    file_path = topic_dir / "papers_info.json"
+# === On-disk result cache (arxiv searches, LLM summaries) ===
+CACHE_DIR = Path(".mcp_cache")
+SEARCH_CACHE_TTL = 24 * 60 * 60  # seconds
+CACHE_MAX_ENTRIES = 1000  # Least recently used entries beyond this are deleted
+_cache_count = None  # Running number of entries, counted on the first write
+# Searches write from worker threads while summaries write on the event loop
+_cache_lock = threading.Lock()
 
+def _cache_path(key: str) -> Path:
+    return CACHE_DIR / f"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}.json"
+
+def cache_get(key: str):
+    """
+    Return the cached value for key, or None if missing or expired.
+    """
+    path = _cache_path(key)
     try:
-        with open(file_path, "r") as f:
-            papers_info = json.load(f)
+        with open(path, "r", encoding="utf-8") as f:
+            entry = orjson.loads(f.read())
     except (FileNotFoundError, json.JSONDecodeError):
-        papers_info = {}
+        return None
+    if entry["expires_at"] is not None and entry["expires_at"] < time.time():
+        path.unlink(missing_ok=True)  # Expired entries are never read again
+        return None
+    try:
+        os.utime(path)  # Mark as recently used for pruning
+    except OSError:
+        pass  # Pruned by another writer since the read
+    return entry["value"]
 
-    paper_ids = []
-    for paper in results:
-        pid = paper.get_short_id()
-        paper_ids.append(pid)
-        papers_info[pid] = {
-            "title": paper.title,
-            "authors": [a.name for a in paper.authors],
-            "summary": paper.summary,
-            "pdf_url": paper.pdf_url,
-            "published": str(paper.published.date())
-        }
+def cache_set(key: str, value, ttl: float = None):
+    """
+    Store value under key, expiring after ttl seconds (never if ttl is None).
+    """
+    global _cache_count
+    CACHE_DIR.mkdir(exist_ok=True)
+    path = _cache_path(key)
+    expires_at = time.time() + ttl if ttl is not None else None
+    # Write to a temp file and rename it over the entry, so readers never see a partial file.
+    # The name is unique per writer, since searches write from worker threads.
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(_json_dumps({"expires_at": expires_at, "value": value}))
+    with _cache_lock:
+        is_new = not path.exists()
+        os.replace(tmp_path, path)
+        if _cache_count is None:
+            _cache_count = len(_cache_entries())
+        elif is_new:
+            _cache_count += 1
+        if _cache_count > CACHE_MAX_ENTRIES:
+            _prune_cache()
 
-    with open(file_path, "w") as f:
-        json.dump(papers_info, f, indent=2)
+def _cache_entries() -> list:
+    """
+    (mtime_ns, path) of every cache entry; files removed mid-scan are skipped.
+    """
+    entries = []
+    with os.scandir(CACHE_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                entries.append((entry.stat().st_mtime_ns, entry.path))
+            except FileNotFoundError:
+                pass
+    return entries
 
-    return paper_ids
+def _prune_cache():
+    """
+    Delete the least recently used entries beyond CACHE_MAX_ENTRIES.
+    Called with _cache_lock held.
+    """
+    global _cache_count
+    entries = sorted(_cache_entries())
+    for _, path in entries[:-CACHE_MAX_ENTRIES]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    _cache_count = min(len(entries), CACHE_MAX_ENTRIES)
 
-def extract_info(paper_id: str) -> str:
+# === Per-topic paper metadata ===
+# New papers are appended one JSON object per line to papers_info.jsonl, so a
+# search only writes what it found. papers_info.json is still read for topics
+# saved by older versions.
+PAPERS_FILE = "papers_info.jsonl"
+LEGACY_PAPERS_FILE = "papers_info.json"
+
+# === Paper ID index: paper_id -> path of the metadata file holding it ===
+_PID_INDEX = {}
+
+@lru_cache(maxsize=64)
+def _load_papers_info(path: str, mtime_ns: int) -> dict:
     """
-    Extract paper info from saved results.
+    Load a topic metadata file (.jsonl or legacy .json). The mtime is part of
+    the cache key, so writing to the file invalidates the cached copy.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if not path.endswith(".jsonl"):
+            return orjson.loads(f.read())
+        papers_info = {}
+        for line in f:
+            if line.strip():
+                papers_info.update(orjson.loads(line))
+        return papers_info
+
+def _topic_files(topic_dir: Path) -> List[Path]:
+    """
+    Existing metadata files of a topic, legacy file first so appended entries win.
+    """
+    candidates = [topic_dir / LEGACY_PAPERS_FILE, topic_dir / PAPERS_FILE]
+    return [file_path for file_path in candidates if file_path.exists()]
+
+def load_topic_papers(topic_dir: Path) -> dict:
+    """
+    Merged {paper_id: metadata} view of everything stored for a topic.
     """
+    papers_info = {}
+    for file_path in _topic_files(topic_dir):
+        papers_info.update(_load_papers_info(str(file_path), file_path.stat().st_mtime_ns))
+    return papers_info
+
+def _build_pid_index():
+    """
+    Scan every topic folder once and index all stored paper IDs.
+    """
+    _PID_INDEX.clear()
     for subdir in Path(PAPER_DIR).iterdir():
         if subdir.is_dir():
-            file_path = subdir / "papers_info.json"
-            if file_path.exists():
+            for file_path in _topic_files(subdir):
                 try:
-                    with open(file_path, "r") as f:
-                        info = json.load(f)
-                        if paper_id in info:
-                            return json.dumps(info[paper_id], indent=2)
+                    info = _load_papers_info(str(file_path), file_path.stat().st_mtime_ns)
                 except Exception as e:
                     print(f"Error reading {file_path}: {e}")
+                    continue
+                for pid in info:
+                    _PID_INDEX[pid] = str(file_path)
+
+def _warm_paper_index():
+    """
+    Build the paper ID index if it has not been built yet.
+    """
+    if not _PID_INDEX:
+        _build_pid_index()
+
+def search_papers(topic: str, max_results: int = 5) -> List[str]:
+    """
+    Search arXiv for papers matching a topic and save the info.
+    """
+    topic_dir = Path(PAPER_DIR) / topic.lower().replace(" ", "_")
+    topic_dir.mkdir(parents=True, exist_ok=True)
+    file_path = topic_dir / PAPERS_FILE
+
+    # Reuse a recent identical search as long as its metadata is still on disk
+    cache_key = f"arxiv:{topic}:{max_results}"
+    if _topic_files(topic_dir):
+        cached_ids = cache_get(cache_key)
+        if cached_ids is not None:
+            return cached_ids
+
+    # One request fetches the whole result set (the API serves up to 2000 per page)
+    page_size = max(1, min(max_results, ARXIV_MAX_PAGE_SIZE))
+    client_arxiv = _arxiv_client(page_size)
+    search = arxiv.Search(query=topic, max_results=max_results, sort_by=arxiv.SortCriterion.Relevance)
+    results = client_arxiv.results(search)
+
+    try:
+        known_ids = load_topic_papers(topic_dir).keys()
+    except (OSError, json.JSONDecodeError):
+        known_ids = set()
+
+    # Append only papers this topic has not stored yet
+    paper_ids = []
+    with open(file_path, "a", buffering=1 << 16, encoding="utf-8") as f:
+        for paper in results:
+            pid = paper.get_short_id()
+            paper_ids.append(pid)
+            if pid in known_ids:
+                continue
+            f.write(_json_dumps({pid: {
+                "title": paper.title,
+                "authors": [a.name for a in paper.authors],
+                "summary": paper.summary,
+                "pdf_url": paper.pdf_url,
+                "published": str(paper.published.date())
+            }}) + "\n")
+            _PID_INDEX[pid] = str(file_path)
+
+    cache_set(cache_key, paper_ids, ttl=SEARCH_CACHE_TTL)
+    return paper_ids
+
+def extract_info(paper_id: str) -> str:
+    """
+    Extract paper info from saved results.
+    """
+    if paper_id not in _PID_INDEX:
+        _build_pid_index()  # First lookup, or the paper was stored by another process
+
+    file_path = _PID_INDEX.get(paper_id)
+    if file_path:
+        try:
+            info = _load_papers_info(file_path, os.stat(file_path).st_mtime_ns)
+            if paper_id in info:
+                return _json_dumps(info[paper_id], indent=True)
+        except Exception as e:
+            print(f"Error reading {file_path}: {e}")
     return f"No info found for paper ID: {paper_id}"
 
+# === Prompt ===
+# Kept first and unchanged in every request so the prompt prefix can be cached
+SYSTEM_PROMPT = "You are a helpful assistant."
+
 # === Tools for function calling ===
+# Tools whose output is shown to the user as-is, without a followup model call
+DIRECT_RETURN_TOOLS = {"extract_info", "summarize_paper"}
+
 tools = [
     {
         "type": "function",
@@ -124,46 +320,137 @@ tools = [
 ]
 
 
-def execute_tool(tool_name, args):
+# === Summarization ===
+SUMMARY_CHUNK_CHARS = 12000  # Roughly 3k tokens per request
+MAX_SUMMARY_CHUNKS = 8  # Text beyond this many chunks is dropped
+SUMMARY_DEADLINE = 30  # seconds per summary request before returning what has streamed in
+MAX_CONCURRENT_COMPLETIONS = 8  # Summary requests in flight across all tool calls
+_completion_sem = asyncio.Semaphore(MAX_CONCURRENT_COMPLETIONS)
+SUMMARY_PROMPT = "You are a helpful research assistant. Summarize this academic paper in plain English."
+CHUNK_SUMMARY_PROMPT = "You are a helpful research assistant. Summarize this excerpt of an academic paper in plain English."
+MERGE_SUMMARY_PROMPT = "You are a helpful research assistant. Combine these partial summaries of one academic paper into a single plain-English summary."
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _chunk(text: str, max_chars: int = SUMMARY_CHUNK_CHARS) -> List[str]:
+    """
+    Split text into chunks of at most max_chars, breaking on sentence ends when possible.
+    """
+    chunks, current, size = [], [], 0
+    for sentence in _SENTENCE_END.split(text):
+        if current and size + len(sentence) + 1 > max_chars:
+            chunks.append(" ".join(current))
+            current, size = [], 0
+        while len(sentence) > max_chars:
+            chunks.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        current.append(sentence)
+        size += len(sentence) + 1
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+async def _complete_summary(text: str, system_prompt: str = SUMMARY_PROMPT) -> Tuple[str, bool]:
+    """
+    Stream a summary from the LLM. Returns (summary, complete); if the deadline
+    passes mid-stream, the text received so far is returned with complete=False.
+    """
+    parts = []
+    # Map-reduce summaries fan out per chunk on top of parallel tool calls; cap the
+    # total in flight. Waiting for a slot doesn't count against the deadline.
+    async with _completion_sem:
+        try:
+            async with asyncio.timeout(SUMMARY_DEADLINE):
+                async with await client.chat.completions.create(
+                    model=AZURE_OPENAI_DEPLOYMENT,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": text}
+                    ],
+                    max_completion_tokens=500,
+                    stream=True
+                ) as stream:
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            parts.append(chunk.choices[0].delta.content)
+        except TimeoutError:
+            partial = "".join(parts).strip()
+            return f"{partial} [summary cut off after {SUMMARY_DEADLINE}s]".lstrip(), False
+        return "".join(parts).strip(), True
+
+
+async def summarize_paper(text: str) -> str:
+    """
+    Summarize a paper with the LLM without blocking the event loop.
+    Long texts are summarized chunk by chunk in parallel, then merged.
+    """
+    cache_key = f"sum:{text}"
+    cached = cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    chunks = _chunk(text)[:MAX_SUMMARY_CHUNKS]
+    if len(chunks) == 1:
+        summary, complete = await _complete_summary(chunks[0])
+    else:
+        partials = await asyncio.gather(
+            *(_complete_summary(chunk, CHUNK_SUMMARY_PROMPT) for chunk in chunks)
+        )
+        summary, complete = await _complete_summary(
+            "\n\n".join(partial for partial, _ in partials), MERGE_SUMMARY_PROMPT
+        )
+        complete = complete and all(done for _, done in partials)
+
+    # Don't persist summaries that were cut off by the deadline
+    if complete:
+        cache_set(cache_key, summary)
+    return summary
+
+
+async def execute_tool(tool_name, args):
     if tool_name == "search_papers":
-        result = search_papers(args["topic"], args.get("max_results", 5))
-        return json.dumps({"paper_ids": result})
+        # arxiv is a blocking client, so keep it off the event loop
+        result = await asyncio.to_thread(search_papers, args["topic"], args.get("max_results", 5))
+        return _json_dumps({"paper_ids": result})
     elif tool_name == "extract_info":
         return extract_info(args["paper_id"])
     elif tool_name == "summarize_paper":
-        # Use the assistant to summarize
-        response = client.chat.completions.create(
-            model=AZURE_OPENAI_DEPLOYMENT,
-            messages=[
-                {"role": "system", "content": "You are a helpful research assistant. Summarize this academic paper in plain English."},
-                {"role": "user", "content": args["text"]}
-            ],
-            max_completion_tokens=500
-        )
-        return response.choices[0].message.content.strip()
+        return await summarize_paper(args["text"])
     return f"Tool {tool_name} not implemented."
 
 
-def process_query(query: str):
-    messages = [{"role": "user", "content": query}]
-    response = client.chat.completions.create(
-        model=AZURE_OPENAI_DEPLOYMENT,
-        messages=messages,
-        tools=tools,
-        tool_choice="auto",
-        max_completion_tokens=1024
+async def process_query(query: str):
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": query}]
+    # Warm the paper index on a worker thread while the routing call is in flight
+    response, _ = await asyncio.gather(
+        client.chat.completions.create(
+            model=AZURE_OPENAI_DEPLOYMENT,
+            messages=messages,
+            tools=tools,
+            tool_choice="auto",
+            max_completion_tokens=1024
+        ),
+        asyncio.to_thread(_warm_paper_index)
     )
 
     msg = response.choices[0].message
 
     if msg.tool_calls:
+        messages.append(assistant_message_dict(msg))
+        calls = []
         for tool_call in msg.tool_calls:
-            tool_name = tool_call.function.name
-            tool_args = json.loads(tool_call.function.arguments)
-            print(f"Calling tool: {tool_name} with args: {tool_args}")
-            tool_result = execute_tool(tool_name, tool_args)
+            tool_args = orjson.loads(tool_call.function.arguments)
+            print(f"Calling tool: {tool_call.function.name} with args: {tool_args}")
+            calls.append((tool_call, tool_args))
+
+        # Run every tool call of this turn concurrently (e.g. several summarize_paper calls)
+        tool_results = await asyncio.gather(
+            *(execute_tool(tool_call.function.name, tool_args) for tool_call, tool_args in calls)
+        )
 
-            messages.append(msg)
+        for (tool_call, _), tool_result in zip(calls, tool_results):
+            tool_name = tool_call.function.name
             messages.append({
                 "role": "tool",
                 "tool_call_id": tool_call.id,
@@ -172,21 +459,26 @@ def process_query(query: str):
 
             # === Tool Chaining: Automatically call extract_info on each paper ID ===
             if tool_name == "search_papers":
-                result_data = json.loads(tool_result)
+                result_data = orjson.loads(tool_result)
                 paper_ids = result_data.get("paper_ids", [])[:3]  # Limit to 3 summaries for readability
 
                 summary_block = ""
                 for pid in paper_ids:
                     paper_json = extract_info(pid)
-                    info = json.loads(paper_json)
+                    info = orjson.loads(paper_json)
                     summary_block += f"\n📝 **{info['title']}**\n- Authors: {', '.join(info['authors'])}\n- Published: {info['published']}\n- PDF: {info['pdf_url']}\n- Summary: {info['summary'][:500]}...\n\n"
 
                 print("Top papers on LLM:")
                 print(summary_block)
                 return  # Skip second chat call, we printed custom output
 
+        # === Tool output already answers the query: skip the second model call ===
+        if all(tool_call.function.name in DIRECT_RETURN_TOOLS for tool_call, _ in calls):
+            print("\n\n".join(tool_results))
+            return
+
         # === fallback second model call ===
-        followup = client.chat.completions.create(
+        followup = await client.chat.completions.create(
             model=AZURE_OPENAI_DEPLOYMENT,
             messages=messages,
             max_completion_tokens=1024
@@ -196,16 +488,17 @@ def process_query(query: str):
         print(msg.content)
 
 
-def chat_loop():
+async def chat_loop():
     print("Type your queries or 'quit' to exit.")
     while True:
         try:
-            query = input("\nQuery: ").strip()
+            # Read the prompt on a worker thread so the event loop stays free
+            query = (await asyncio.to_thread(input, "\nQuery: ")).strip()
             if query.lower() == "quit":
                 break
-            process_query(query)
+            await process_query(query)
         except Exception as e:
             print(f"Error: {e}")
 
 if __name__ == "__main__":
-    chat_loop()
+    asyncio.run(chat_loop())
@@ -0,0 +1,27 @@
+import orjson
+
+
+def canonical_json(arguments: str) -> str:
+    """Re-serialize JSON with sorted keys and no whitespace so equal calls are byte-identical."""
+    try:
+        data = orjson.loads(arguments)
+    except orjson.JSONDecodeError:
+        return arguments
+    return orjson.dumps(data, option=orjson.OPT_SORT_KEYS).decode()
+
+
+def assistant_message_dict(message) -> dict:
+    """Assistant message as a plain dict with canonical tool-call arguments."""
+    entry = {"role": "assistant", "content": message.content}
+    if message.tool_calls:
+        entry["tool_calls"] = [
+            {
+                "id": tool_call.id,
+                "type": "function",
+                "function": {
+                    "name": tool_call.function.name,
+                    "arguments": canonical_json(tool_call.function.arguments)
+                }
+            } for tool_call in message.tool_calls
+        ]
+    return entry
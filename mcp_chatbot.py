@@ -1,5 +1,5 @@
 from dotenv import load_dotenv
-from openai import AzureOpenAI
+from openai import AsyncAzureOpenAI
 from mcp import ClientSession, StdioServerParameters, types
 from mcp.client.stdio import stdio_client
 from typing import List
@@ -8,6 +8,11 @@ import nest_asyncio
 import os
 import json
 import argparse
+import collections
+
+import orjson
+
+from chat_utils import assistant_message_dict
 
 nest_asyncio.apply()
 load_dotenv()
@@ -17,111 +22,365 @@ AZURE_OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_MODEL")
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-03-01-preview")
 
+# Kept first and unchanged in every request so the prompt prefix can be cached
+SYSTEM_PROMPT = "You are a helpful assistant."
+
+# Max number of papers processed concurrently during tool chaining
+MAX_CONCURRENT_PAPERS = 3
+# Upper bound on one paper's chain, so a stuck PDF download can't hold the batch
+PER_PAPER_DEADLINE = 120  # seconds
+# Prefix of the text get_full_text returns when it could not fetch or parse the PDF
+FULL_TEXT_FAILURE_PREFIX = "Failed to fetch"
+
+# Global caps on in-flight MCP tool calls / Azure OpenAI requests
+MAX_CONCURRENCY = int(os.getenv("MCP_MAX_CONCURRENCY", "8"))
+MAX_REQUESTS_PER_SECOND = int(os.getenv("MCP_MAX_REQUESTS_PER_SECOND", "10"))
+# Set MCP_PARALLEL_TOOL_CALLS=0 to run one turn's tool calls one after another
+PARALLEL_TOOL_CALLS = os.getenv("MCP_PARALLEL_TOOL_CALLS", "1") != "0"
+
+# Message history compaction: once the history exceeds the budget, everything
+# but the system prompt and the last few turns is replaced by a summary
+HISTORY_BUDGET_CHARS = 24000
+HISTORY_KEEP_TURNS = 4
+HISTORY_MAX_MESSAGES = 40  # Compact on message count too, since tool-heavy turns add many short messages
+
+
+def _tool_failed(result) -> bool:
+    """True for a tool call that raised or that the server flagged with isError."""
+    return isinstance(result, Exception) or getattr(result, "isError", False)
+
+
+def _message_field(message, field: str):
+    """Read a field from a history entry, which is either a dict or an SDK message object."""
+    if isinstance(message, dict):
+        return message.get(field)
+    return getattr(message, field, None)
+
+
+class RateLimiter:
+    """Async context manager allowing at most `rate` entries per `period` seconds."""
+
+    def __init__(self, rate: int, period: float = 1.0):
+        self.rate = rate
+        self.period = period
+        self._timestamps = collections.deque()
+        self._lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                while self._timestamps and now - self._timestamps[0] >= self.period:
+                    self._timestamps.popleft()
+                if len(self._timestamps) < self.rate:
+                    self._timestamps.append(now)
+                    return self
+                await asyncio.sleep(self.period - (now - self._timestamps[0]))
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
 
 class MCP_ChatBot:
     def __init__(self):
         self.session: ClientSession = None
         self.available_tools: List[dict] = []
+        self._tool_name_set = frozenset()
+        self._tools_payload: tuple = ()
         self.sessions = {}
         self.available_prompts = []
-        self.client = AzureOpenAI(
+        self.client = AsyncAzureOpenAI(
             api_key=AZURE_OPENAI_API_KEY,
             api_version=AZURE_OPENAI_API_VERSION,
             azure_endpoint=AZURE_OPENAI_ENDPOINT
         )
-        self.message_history = [{"role": "system", "content": "You are a helpful assistant."}]
+        self.message_history = [{"role": "system", "content": SYSTEM_PROMPT}]
+        self._paper_semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAPERS)
+        self.enable_parallel_tool_execution = PARALLEL_TOOL_CALLS
+        self.window_size = 20  # Recent messages sent per request; the full history stays local
+        self._window_start = 1  # Index in message_history where the sent window begins
+        self._sem = asyncio.Semaphore(MAX_CONCURRENCY)
+        self._limiter = RateLimiter(MAX_REQUESTS_PER_SECOND, 1)
+
+    async def _call_tool(self, name: str, args: dict):
+        """Call an MCP tool under the global concurrency and rate limits."""
+        async with self._sem, self._limiter:
+            return await self.session.call_tool(name, arguments=args)
+
+    async def _chat_completion(self, **kwargs):
+        """Request a chat completion under the global concurrency and rate limits."""
+        async with self._sem, self._limiter:
+            return await self.client.chat.completions.create(**kwargs)
+
+    async def _process_one(self, pid: str) -> dict:
+        """Run the extract → full_text → summarize chain for a single paper.
+
+        Failures and timeouts are returned under "error" instead of raised, so
+        one bad paper does not cancel the others in the task group.
+        """
+        async with self._paper_semaphore:
+            try:
+                async with asyncio.timeout(PER_PAPER_DEADLINE):
+                    # Metadata and full text only need the paper ID, so fetch both at once
+                    fetches = [self._call_tool("extract_info", {"paper_id": pid})]
+                    if "get_full_text" in self._tool_name_set:
+                        fetches.append(self._call_tool("get_full_text", {"paper_id": pid}))
+                    info_result, *full_text_results = await asyncio.gather(*fetches, return_exceptions=True)
+
+                    full_text = None
+                    if full_text_results and not _tool_failed(full_text_results[0]):
+                        text = full_text_results[0].content[0].text
+                        # get_full_text reports download/parse failures as ordinary text
+                        if not text.startswith(FULL_TEXT_FAILURE_PREFIX):
+                            full_text = text
+                    if _tool_failed(info_result):
+                        if isinstance(info_result, Exception):
+                            error = info_result
+                        else:
+                            error = RuntimeError(info_result.content[0].text)
+                        if full_text is None:
+                            raise error
+                        info_text = f"extract_info failed: {error}"
+                    else:
+                        info_text = info_result.content[0].text
+
+                    # Choose what to summarize
+                    text_to_summarize = full_text or info_text  # Fallback to metadata if full text fails
+
+                    summary_text = None
+                    if "summarize_paper" in self._tool_name_set:
+                        summary_result = await self._call_tool("summarize_paper", {"text": text_to_summarize})
+                        summary_text = summary_result.content[0].text
+            except TimeoutError:
+                return {"error": f"timed out after {PER_PAPER_DEADLINE}s"}
+            except Exception as e:
+                return {"error": e}
+
+            return {"info_text": info_text, "full_text": full_text, "summary_text": summary_text}
 
     async def handle_search_and_summarize(self, paper_ids: List[str]):
-        for pid in paper_ids[:3]:
-            print(f"\n🔎 Extracting info for {pid}")
+        paper_ids = paper_ids[:3]
+        print(f"\n🔎 Extracting info for {', '.join(paper_ids)}")
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(self._process_one(pid)) for pid in paper_ids]
+
+        # Print in the original order so output stays readable
+        for pid, task in zip(paper_ids, tasks):
+            self._print_paper_result(pid, task.result())
+
+    def _print_paper_result(self, pid: str, result: dict):
+        if "error" in result:
+            print(f"⚠️ Error during extract/full_text/summarize chain for {pid}: {result['error']}")
+            return
+
+        print(f"📄 Info for {pid}:\n{result['info_text'][:400]}...\n")
+        if result.get("full_text") is not None:
+            print(f"📄 Full text (truncated preview):\n{result['full_text'][:500]}...\n")
+        if result.get("summary_text") is not None:
+            print(f"✅ Summary for {pid}:\n{result['summary_text']}\n")
+        else:
+            print("❌ summarize_paper tool not available.")
+
+    def _resolve_tool(self, name: str) -> str:
+        """Route search_papers to the fused server tool when the server offers it."""
+        if name == "search_papers" and "search_extract_and_summarize" in self._tool_name_set:
+            return "search_extract_and_summarize"
+        return name
+
+    async def run_tool_calls(self, parsed_calls: List[tuple]) -> list:
+        """Call each (tool_call, tool_args) pair, returning results or exceptions in order."""
+        if self.enable_parallel_tool_execution:
+            return await asyncio.gather(
+                *(self._call_tool(self._resolve_tool(tool_call.function.name), tool_args)
+                  for tool_call, tool_args in parsed_calls),
+                return_exceptions=True
+            )
+
+        results = []
+        for tool_call, tool_args in parsed_calls:
             try:
-                info_result = await self.session.call_tool("extract_info", {"paper_id": pid})
-                info_text = info_result.content[0].text
-                print(f"📄 Info for {pid}:\n{info_text[:400]}...\n")
-
-                # Try getting full text using get_full_text tool
-                full_text = None
-                if "get_full_text" in {tool["function"]["name"] for tool in self.available_tools}:
-                    print(f"📥 Downloading full text for {pid}")
-                    full_text_result = await self.session.call_tool("get_full_text", {"paper_id": pid})
-                    full_text = full_text_result.content[0].text
-                    print(f"📄 Full text (truncated preview):\n{full_text[:500]}...\n")
-
-                # Choose what to summarize
-                text_to_summarize = full_text or info_text  # Fallback to metadata if full text fails
-
-                if "summarize_paper" in {tool["function"]["name"] for tool in self.available_tools}:
-                    print(f"🧠 Summarizing {pid}")
-                    summary_result = await self.session.call_tool("summarize_paper", {"text": text_to_summarize})
-                    summary_text = summary_result.content[0].text
-                    print(f"✅ Summary for {pid}:\n{summary_text}\n")
-                else:
-                    print("❌ summarize_paper tool not available.")
+                results.append(await self._call_tool(self._resolve_tool(tool_call.function.name), tool_args))
             except Exception as e:
-                print(f"⚠️ Error during extract/full_text/summarize chain for {pid}: {e}")
+                results.append(e)
+        return results
 
     async def process_query(self, query: str):
-        messages = self.message_history + [{"role": "user", "content": query}]
-        response = self.client.chat.completions.create(
+        messages = self._windowed() + [{"role": "user", "content": query}]
+        response = await self._chat_completion(
             model=AZURE_OPENAI_DEPLOYMENT,
             messages=messages,
-            tools=self.available_tools,
+            tools=self._tools_payload,
             tool_choice="auto",
             max_completion_tokens=1024
         )
 
         assistant_message = response.choices[0].message
-        available_tool_names = {tool["function"]["name"] for tool in self.available_tools}
         self.message_history.append({"role": "user", "content": query})
-        self.message_history.append(assistant_message)
+        self.message_history.append(assistant_message_dict(assistant_message))
+        assistant_index = len(self.message_history) - 1
 
         if assistant_message.tool_calls:
+            # Parse every call first so malformed arguments are skipped up front
+            parsed_calls = []
+            errors = {}  # tool_call.id -> error reported back to the model
             for tool_call in assistant_message.tool_calls:
-                tool_name = tool_call.function.name
                 try:
                     print(f"🔧 Raw tool args: {tool_call.function.arguments}")
-                    tool_args = json.loads(tool_call.function.arguments)
+                    tool_args = orjson.loads(tool_call.function.arguments)
                 except json.JSONDecodeError as e:
                     print(f"❌ JSONDecodeError while parsing tool arguments: {e}")
+                    errors[tool_call.id] = f"Error: invalid tool arguments: {e}"
+                    continue
+                print(f"🛠️ Calling tool '{tool_call.function.name}' with args: {tool_args}")
+                parsed_calls.append((tool_call, tool_args))
+
+            results = await self.run_tool_calls(parsed_calls)
+            results_by_id = {tool_call.id: result for (tool_call, _), result in zip(parsed_calls, results)}
+
+            # Every tool_call id needs a tool message, failed or not, or the API
+            # rejects this and every later request. Reply in the order the model emitted the calls
+            any_tool_succeeded = False
+            for tool_call in assistant_message.tool_calls:
+                tool_name = tool_call.function.name
+                result = results_by_id.get(tool_call.id)
+                tool_result_text = None
+                if tool_call.id in errors:
+                    content = errors[tool_call.id]
+                elif isinstance(result, Exception):
+                    print(f"❗ Failed to call tool {tool_name}: {result}")
+                    content = f"Error: {result}"
+                else:
+                    try:
+                        text = (
+                            result.content[0].text if hasattr(result.content[0], "text") else str(result.content)
+                        )
+                    except Exception as e:
+                        print(f"❗ Failed to handle result of tool {tool_name}: {e}")
+                        content = f"Error: {e}"
+                    else:
+                        # FastMCP reports a failing tool as a result with isError set, not an exception
+                        if getattr(result, "isError", False):
+                            print(f"❗ Tool {tool_name} returned an error: {text}")
+                            content = f"Error: {text}"
+                        else:
+                            tool_result_text = text
+                            content = text
+                            any_tool_succeeded = True
+
+                self.message_history.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "content": content
+                })
+                if tool_result_text is None:
                     continue
 
-                print(f"🛠️ Calling tool '{tool_name}' with args: {tool_args}")
                 try:
-                    result = await self.session.call_tool(tool_name, arguments=tool_args)
-                    tool_result_text = (
-                        result.content[0].text if hasattr(result.content[0], "text") else str(result.content)
-                    )
-                    self.message_history.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "content": tool_result_text
-                    })
+                    fused = self._resolve_tool(tool_name) == "search_extract_and_summarize"
 
-                    # Optional print toggle
-                    if tool_name not in {"extract_info", "summarize_paper"}:
+                    # Optional print toggle (fused results are printed per paper below)
+                    if tool_name not in {"extract_info", "summarize_paper"} and not fused:
                         print("🧩 Tool Result:", result.content)
 
+                    # The fused tool already ran extract + summarize on the server
+                    if fused:
+                        for paper in orjson.loads(tool_result_text)["papers"]:
+                            self._print_paper_result(paper["paper_id"], {
+                                "info_text": paper["info"],
+                                "summary_text": paper.get("summary"),
+                                **({"error": paper["error"]} if "error" in paper else {})
+                            })
                     # Special handling for tool chaining
-                    if tool_name == "search_papers" and {"extract_info", "summarize_paper"}.issubset(available_tool_names):
+                    elif tool_name == "search_papers" and {"extract_info", "summarize_paper"} <= self._tool_name_set:
                         try:
-                            paper_ids = json.loads(tool_result_text)
+                            paper_ids = orjson.loads(tool_result_text)
                             await self.handle_search_and_summarize(paper_ids)
                         except Exception as e:
                             print(f"⚠️ Tool chaining error: {e}")
                 except Exception as e:
-                    print(f"❗ Failed to call tool {tool_name}: {e}")
+                    print(f"❗ Failed to handle result of tool {tool_name}: {e}")
+
+            if not any_tool_succeeded:
+                # Only errors for the model to read, so a followup call would add nothing.
+                # Replace the tool_calls message and its error replies with the plain answer
+                del self.message_history[assistant_index:]
+                if assistant_message.content:
+                    print(assistant_message.content)
+                    self.message_history.append({"role": "assistant", "content": assistant_message.content})
+                await self._compact_history()
+                return
 
             # Final model response with full message history
-            followup = self.client.chat.completions.create(
+            followup = await self._chat_completion(
                 model=AZURE_OPENAI_DEPLOYMENT,
-                messages=self.message_history,
+                messages=self._windowed(),
                 max_completion_tokens=1024
             )
             print(followup.choices[0].message.content)
-            self.message_history.append(followup.choices[0].message)
+            self.message_history.append(assistant_message_dict(followup.choices[0].message))
         else:
             print(assistant_message.content)
 
+        await self._compact_history()
+
+    def _windowed(self) -> list:
+        """Leading system messages plus an append-only window of recent messages.
+
+        The window grows with each turn, so consecutive requests share their
+        whole prefix and hit the prompt cache. Once it reaches twice
+        window_size, it snaps forward to about the last window_size messages.
+        It always starts at a user message, so no tool result is sent without
+        the assistant tool call it answers.
+        """
+        history = self.message_history
+        head = 1
+        while head < len(history) and _message_field(history[head], "role") == "system":
+            head += 1
+
+        start = max(self._window_start, head)
+        if len(history) - start >= 2 * self.window_size:
+            boundary = len(history) - self.window_size
+            turn_starts = [i for i in range(boundary, len(history)) if _message_field(history[i], "role") == "user"]
+            if turn_starts:
+                start = self._window_start = turn_starts[0]
+        return history[:head] + history[start:]
+
+    async def _compact_history(self):
+        """Fold older turns into a summary once the history outgrows its budget."""
+        if (len(self.message_history) <= HISTORY_MAX_MESSAGES and
+                sum(len(_message_field(m, "content") or "") for m in self.message_history) <= HISTORY_BUDGET_CHARS):
+            return
+
+        # Each turn starts with a user message; keep the most recent turns verbatim
+        turn_starts = [i for i, m in enumerate(self.message_history) if _message_field(m, "role") == "user"]
+        if len(turn_starts) <= HISTORY_KEEP_TURNS:
+            return
+        cut = turn_starts[-HISTORY_KEEP_TURNS]
+
+        # Includes any earlier summary, so older context is summarized recursively
+        transcript = "\n".join(
+            f"{_message_field(m, 'role')}: {(_message_field(m, 'content') or '')[:2000]}"
+            for m in self.message_history[1:cut]
+        )
+        try:
+            response = await self._chat_completion(
+                model=AZURE_OPENAI_DEPLOYMENT,
+                messages=[
+                    {"role": "system", "content": "Summarize this conversation briefly, keeping facts, paper IDs and decisions."},
+                    {"role": "user", "content": transcript}
+                ],
+                max_completion_tokens=300
+            )
+        except Exception as e:
+            print(f"⚠️ Could not compact message history: {e}")
+            return
+
+        summary = response.choices[0].message.content.strip()
+        self.message_history[1:cut] = [{"role": "system", "content": f"Summary so far: {summary}"}]
+        # history[1:cut] collapsed into one message, so shift the window start with it
+        self._window_start = self._window_start - cut + 2 if self._window_start >= cut else 1
+
     async def list_available_resources(self):
         """List all available resources and cache their sessions."""
         if not self.session:
@@ -228,7 +487,8 @@ class MCP_ChatBot:
 
         while True:
             try:
-                query = input("\n🗨️ Query: ").strip()
+                # Read the prompt on a worker thread so the event loop stays free
+                query = (await asyncio.to_thread(input, "\n🗨️ Query: ")).strip()
 
                 if not query:
                     continue
@@ -323,6 +583,11 @@ class MCP_ChatBot:
                         }
                     } for tool in response.tools
                 ]
+                # A stable tool order keeps the request prefix identical across turns;
+                # reordering tools breaks the prompt-cache hit, so keep the sort key fixed
+                self.available_tools.sort(key=lambda t: t["function"]["name"])
+                self._tools_payload = tuple(self.available_tools)
+                self._tool_name_set = frozenset(t["function"]["name"] for t in self.available_tools)
 
                 # 🔗 List resources and 🧠 prompts
                 await self.list_available_resources()
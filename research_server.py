@@ -1,15 +1,30 @@
 
 import os
 import json
-import arxiv
-import fitz  # PyMuPDF
-import tempfile
-import os
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, List, Tuple
 from dotenv import load_dotenv
 from fastmcp import FastMCP
 
+import orjson
+
+if TYPE_CHECKING:
+    import arxiv  # Imported lazily at runtime; only needed for annotations here
+
+def _json_dumps(obj, indent: bool = False) -> str:
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+
+def _json_dumpb(obj, indent: bool = False) -> bytes:
+    """Like _json_dumps but returns UTF-8 bytes, skipping the decode for file writes."""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
 # Initialize MCP
 mcp = FastMCP("research")
 
@@ -20,38 +35,238 @@ AZURE_OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_MODEL")
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
 AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION", "2024-03-01-preview")
 
-from openai import AzureOpenAI
-client = AzureOpenAI(
-    api_key=AZURE_OPENAI_API_KEY,
-    api_version=AZURE_OPENAI_API_VERSION,
-    azure_endpoint=AZURE_OPENAI_ENDPOINT
-)
+# arxiv, fitz (PyMuPDF), openai and httpx are imported where they are first needed,
+# so the server starts fast and metadata-only tools never load them
+
+@lru_cache(maxsize=1)
+def _client():
+    import httpx
+    from openai import AsyncAzureOpenAI, DefaultAsyncHttpxClient
+    return AsyncAzureOpenAI(
+        api_key=AZURE_OPENAI_API_KEY,
+        api_version=AZURE_OPENAI_API_VERSION,
+        azure_endpoint=AZURE_OPENAI_ENDPOINT,
+        # Keep idle connections for a minute so bursts of summaries skip the TLS handshake
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60)
+        )
+    )
+
+@lru_cache(maxsize=1)
+def _http_client():
+    """Shared async HTTP client for PDF downloads, so connections are reused across calls."""
+    import httpx
+    return httpx.AsyncClient(limits=httpx.Limits(max_connections=16), follow_redirects=True, timeout=60)
 
 PAPER_DIR = "papers"
-Path(PAPER_DIR).mkdir(exist_ok=True)
+_PAPER_DIR = Path(PAPER_DIR)
+_PAPER_DIR.mkdir(exist_ok=True)
+
+def _topic_path(topic: str) -> Path:
+    """Folder holding a topic's metadata, e.g. "Graph Nets" -> papers/graph_nets."""
+    return _PAPER_DIR / topic.lower().replace(" ", "_")
+
+ARXIV_MAX_PAGE_SIZE = 2000
+MAX_FULL_TEXT_CHARS = 20000  # Truncate full text to fit the LLM context
+MAX_PDF_BYTES = 25_000_000  # Stop downloading oversized PDFs; MuPDF still reads the leading pages
+
+# LRU of summaries keyed by a hash of the input text (lru_cache cannot wrap a coroutine)
+SUMMARY_CACHE_SIZE = 128
+SUMMARY_CACHE_MIN_CHARS = 256
+MAX_CONCURRENT_SUMMARIES = 8  # Upper bound on papers summarized at once, across all tools
+MAX_FUSED_PAPERS = 3  # search_extract_and_summarize summarizes at most this many results
+# Shared by summarize_papers and search_extract_and_summarize
+_summary_sem = asyncio.Semaphore(MAX_CONCURRENT_SUMMARIES)
+_summary_cache: OrderedDict = OrderedDict()
+
+@lru_cache(maxsize=8)
+def _arxiv_client(page_size: int = 1) -> "arxiv.Client":
+    """
+    Shared arxiv client per page size, so its HTTP session (and rate limiting)
+    persists across tool calls.
+    """
+    import arxiv
+    return arxiv.Client(page_size=page_size, delay_seconds=3, num_retries=3)
+
+# path -> (mtime_ns, parsed JSON); one entry per file, so a rewrite replaces the old copy
+_JSON_CACHE: dict = {}
+
+def _load_json(path: str, mtime_ns: int) -> dict:
+    """Load a JSON (or JSONL) metadata file, reusing the parsed copy while its mtime is unchanged."""
+    hit = _JSON_CACHE.get(path)
+    if hit and hit[0] == mtime_ns:
+        return hit[1]
+    with open(path, "rb") as f:
+        raw = f.read()
+    if path.endswith(".jsonl"):
+        data = {}
+        for line in raw.splitlines(keepends=True):
+            # A line without its newline is still being appended; skip it
+            if line.endswith(b"\n") and line.strip():
+                data.update(orjson.loads(line))
+    else:
+        data = orjson.loads(raw)
+    _JSON_CACHE[path] = (mtime_ns, data)
+    return data
+
+# Per-topic metadata. Searches append one {paper_id: metadata} line per new paper
+# to papers_info.jsonl instead of rewriting the whole file; papers_info.json is
+# still read for topics saved before the switch.
+PAPERS_FILE = "papers_info.jsonl"
+LEGACY_PAPERS_FILE = "papers_info.json"
+
+def _topic_files(topic_dir: Path) -> List[Tuple[str, int]]:
+    """
+    (path, mtime_ns) of a topic's existing metadata files, legacy file first so
+    appended entries win. One stat() per file both checks existence and gets the mtime.
+    """
+    files = []
+    for name in (LEGACY_PAPERS_FILE, PAPERS_FILE):
+        file_path = topic_dir / name
+        try:
+            files.append((str(file_path), file_path.stat().st_mtime_ns))
+        except FileNotFoundError:
+            pass
+    return files
+
+def _load_topic(topic_dir: Path) -> dict:
+    """Merged {paper_id: metadata} view of everything stored for a topic."""
+    papers_info = {}
+    for file_path, mtime_ns in _topic_files(topic_dir):
+        papers_info.update(_load_json(file_path, mtime_ns))
+    return papers_info
+
+# Reverse index paper_id -> topic folder, so extract_info reads a single file
+INDEX_FILE = _PAPER_DIR / "_index.json"
+_index_lock = threading.Lock()
+_papers_lock = threading.Lock()
+
+def _write_json_atomic(file_path: Path, data: dict):
+    """Write JSON to a temp file and rename it over file_path, so readers never see a partial file."""
+    # Unique per writer, so concurrent writers never share a temp file
+    tmp_path = file_path.with_name(f"{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_json_dumpb(data, indent=True))
+    os.replace(tmp_path, file_path)
+
+# On-disk cache of extracted full text and summaries, so repeats survive restarts.
+# It holds no papers_info files, so the topic scans skip it.
+CACHE_DIR = _PAPER_DIR / ".cache"
+CACHE_SIZE_LIMIT = 2 << 30  # 2 GiB; least recently used entries are pruned beyond this
+_cache_bytes = None  # Running size of CACHE_DIR, measured on the first write
+_cache_lock = threading.Lock()  # Cache writes run on worker threads
+
+def _cache_path(key: str) -> Path:
+    return CACHE_DIR / f"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}.json"
+
+def _cache_get(key: str):
+    """Return the cached value for key, or None if missing."""
+    path = _cache_path(key)
+    try:
+        with open(path, "rb") as f:
+            value = orjson.loads(f.read())["value"]
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    try:
+        os.utime(path)  # Mark as recently used, so pruning removes colder entries first
+    except OSError:
+        pass
+    return value
+
+def _cache_set(key: str, value):
+    global _cache_bytes
+    CACHE_DIR.mkdir(exist_ok=True)
+    path = _cache_path(key)
+    # Entries are small (capped text or a summary), so the write itself is held under the
+    # lock too; that keeps the old-size/new-size accounting exact for concurrent writers
+    with _cache_lock:
+        try:
+            old_size = path.stat().st_size  # Overwriting a key frees its old entry
+        except FileNotFoundError:
+            old_size = 0
+        _write_json_atomic(path, {"value": value})
+        if _cache_bytes is None:
+            _cache_bytes = sum(size for _, size, _ in _cache_entries())
+        else:
+            _cache_bytes += path.stat().st_size - old_size
+        if _cache_bytes > CACHE_SIZE_LIMIT:
+            _prune_cache()
+
+def _cache_entries() -> list:
+    """(mtime_ns, size, path) of every cache file."""
+    entries = []
+    with os.scandir(CACHE_DIR) as it:
+        for entry in it:
+            if entry.name.endswith(".json") and entry.is_file():
+                st = entry.stat()
+                entries.append((st.st_mtime_ns, st.st_size, entry.path))
+    return entries
+
+def _prune_cache():
+    """Delete least recently used cache files until the cache fits CACHE_SIZE_LIMIT."""
+    global _cache_bytes
+    entries = sorted(_cache_entries())
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= CACHE_SIZE_LIMIT:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+    _cache_bytes = total
+
+def _load_index() -> dict:
+    try:
+        return _load_json(str(INDEX_FILE), INDEX_FILE.stat().st_mtime_ns)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def _update_index(paper_ids: List[str], topic_dir: Path):
+    # Repeat searches usually find papers that are already indexed; skip the rewrite then
+    index = _load_index()
+    if all(index.get(pid) == topic_dir.name for pid in paper_ids):
+        return
+    with _index_lock:
+        # Read-modify-write straight from disk rather than through the cache
+        try:
+            with open(INDEX_FILE, "rb") as f:
+                index = orjson.loads(f.read())
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = {}
+        index.update({pid: topic_dir.name for pid in paper_ids})
+        _write_json_atomic(INDEX_FILE, index)
 
 @mcp.tool()
-def search_papers(topic: str, max_results: int = 5) -> List[str]:
+async def search_papers(topic: str, max_results: int = 5) -> List[str]:
     """Search arXiv for papers matching a topic and save the results locally."""
-    client_arxiv = arxiv.Client()
+    # arxiv and the metadata writes are blocking, so run them on a worker thread
+    return await asyncio.to_thread(_search_and_save, topic, max_results)
+
+def _search_and_save(topic: str, max_results: int) -> List[str]:
+    import arxiv
+    # One request fetches the whole result set (the API serves up to 2000 per page)
+    page_size = max(1, min(max_results, ARXIV_MAX_PAGE_SIZE))
+    client_arxiv = _arxiv_client(page_size)
     search = arxiv.Search(query=topic, max_results=max_results, sort_by=arxiv.SortCriterion.Relevance)
-    results = client_arxiv.results(search)
+    # Fetch everything up front so no network I/O happens while the file lock is held
+    results = list(client_arxiv.results(search))
 
-    topic_dir = Path(PAPER_DIR) / topic.lower().replace(" ", "_")
+    topic_dir = _topic_path(topic)
     topic_dir.mkdir(parents=True, exist_ok=True)
-    file_path = topic_dir / "papers_info.json"
-
-    try:
-        with open(file_path, "r") as f:
-            papers_info = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        papers_info = {}
+    file_path = topic_dir / PAPERS_FILE
 
+    # Papers already stored keep their metadata, so skip reading their fields
+    known = _load_topic(topic_dir).keys()
     paper_ids = []
+    new_info = {}
     for paper in results:
         pid = paper.get_short_id()
         paper_ids.append(pid)
-        papers_info[pid] = {
+        if pid in known:
+            continue
+        new_info[pid] = {
             "title": paper.title,
             "authors": [a.name for a in paper.authors],
             "summary": paper.summary,
@@ -59,31 +274,85 @@ def search_papers(topic: str, max_results: int = 5) -> List[str]:
             "published": str(paper.published.date())
         }
 
-    with open(file_path, "w") as f:
-        json.dump(papers_info, f, indent=2)
+    # Searches run on worker threads; serialize appends so lines never interleave
+    with _papers_lock:
+        # Re-check under the lock: a concurrent search may have stored some of these
+        known = _load_topic(topic_dir).keys()
+        lines = [_json_dumpb({pid: info}) + b"\n" for pid, info in new_info.items() if pid not in known]
+        if lines:
+            with open(file_path, "ab") as f:
+                f.write(b"".join(lines))
 
+    _update_index(paper_ids, topic_dir)
     return paper_ids
 
 @mcp.tool()
 def extract_info(paper_id: str) -> str:
     """Extract metadata for a specific arXiv paper by ID from local storage."""
-    for subdir in Path(PAPER_DIR).iterdir():
-        if subdir.is_dir():
-            file_path = subdir / "papers_info.json"
-            if file_path.exists():
-                try:
-                    with open(file_path, "r") as f:
-                        info = json.load(f)
-                        if paper_id in info:
-                            return json.dumps(info[paper_id], indent=2)
-                except Exception as e:
-                    return f"Error reading {file_path}: {str(e)}"
+    return _extract_info(paper_id)
+
+def _extract_info(paper_id: str) -> str:
+    topic = _load_index().get(paper_id)
+    if topic:
+        topic_dir = _PAPER_DIR / topic
+        try:
+            info = _load_topic(topic_dir)
+            if paper_id in info:
+                return _json_dumps(info[paper_id], indent=True)
+        except Exception as e:
+            return f"Error reading {topic_dir}: {str(e)}"
+
+    # Not indexed (e.g. saved before the index existed): scan every topic
+    # scandir entries carry their file type, so is_dir() needs no extra stat()
+    with os.scandir(PAPER_DIR) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            try:
+                info = _load_topic(Path(entry.path))
+            except Exception as e:
+                return f"Error reading {entry.path}: {str(e)}"
+            if paper_id in info:
+                return _json_dumps(info[paper_id], indent=True)
     return f"No info found for paper ID: {paper_id}"
 
 @mcp.tool()
-def summarize_paper(text: str) -> str:
+async def summarize_paper(text: str) -> str:
     """Summarize a detailed research paper using Azure OpenAI."""
-    response = client.chat.completions.create(
+    return await _summarize(text)
+
+@mcp.tool()
+async def summarize_papers(texts: List[str]) -> List[str]:
+    """Summarize several research papers concurrently using Azure OpenAI."""
+    async def one(text: str) -> str:
+        async with _summary_sem:
+            return await _summarize(text)
+
+    return await asyncio.gather(*(one(text) for text in texts))
+
+async def _summarize(text: str) -> str:
+    # Short inputs are cheap to redo and would only crowd the cache
+    if len(text) < SUMMARY_CACHE_MIN_CHARS:
+        return await _summarize_uncached(text)
+
+    key = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+    if key in _summary_cache:
+        _summary_cache.move_to_end(key)
+        return _summary_cache[key]
+
+    # Fall back to the disk cache, which outlives server restarts
+    # File I/O runs on a worker thread so it doesn't stall the event loop
+    summary = await asyncio.to_thread(_cache_get, f"summary:{key}")
+    if summary is None:
+        summary = await _summarize_uncached(text)
+        await asyncio.to_thread(_cache_set, f"summary:{key}", summary)
+    _summary_cache[key] = summary
+    if len(_summary_cache) > SUMMARY_CACHE_SIZE:
+        _summary_cache.popitem(last=False)
+    return summary
+
+async def _summarize_uncached(text: str) -> str:
+    response = await _client().chat.completions.create(
         model=AZURE_OPENAI_DEPLOYMENT,
         messages=[
             {"role": "system", "content": "You are a helpful research assistant. Summarize this academic paper in plain English."},
@@ -94,62 +363,168 @@ def summarize_paper(text: str) -> str:
     return response.choices[0].message.content.strip()
 
 @mcp.tool()
-def get_full_text(paper_id: str) -> str:
+async def get_full_text(paper_id: str) -> str:
     """Download and extract full text from an arXiv paper using its ID."""
+    return await _get_full_text(paper_id)
+
+async def _get_full_text(paper_id: str) -> str:
+    cached = await asyncio.to_thread(_cache_get, f"full_text:{paper_id}")
+    if cached is not None:
+        return cached
     try:
-        paper = next(arxiv.Search(id_list=[paper_id]).results())
-        with tempfile.TemporaryDirectory() as tmpdir:
-            pdf_path = os.path.join(tmpdir, f"{paper_id}.pdf")
-            paper.download_pdf(filename=pdf_path)
-
-            doc = fitz.open(pdf_path)
-            full_text = "\n".join([page.get_text() for page in doc])
-            return full_text[:20000]  # Truncate if needed (LLM context length)
+        # Saved metadata already has the PDF URL; only ask the arXiv API when it doesn't
+        pdf_url = _local_pdf_url(paper_id) or await asyncio.to_thread(_lookup_pdf_url, paper_id)
+        # Stream the download and stop at the cap; only the opening pages are ever used
+        pdf_bytes = bytearray()
+        async with _http_client().stream("GET", pdf_url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(1 << 16):
+                pdf_bytes.extend(chunk)
+                if len(pdf_bytes) >= MAX_PDF_BYTES:
+                    break
+        # PDF parsing is CPU-bound; worker processes let several papers parse in parallel
+        loop = asyncio.get_running_loop()
+        full_text = await loop.run_in_executor(_pdf_pool(), _extract_text, bytes(pdf_bytes))
     except Exception as e:
         return f"Failed to fetch or extract text for {paper_id}: {e}"
+    await asyncio.to_thread(_cache_set, f"full_text:{paper_id}", full_text)
+    return full_text
+
+def _local_pdf_url(paper_id: str):
+    topic = _load_index().get(paper_id)
+    if not topic:
+        return None
+    try:
+        info = _load_topic(_PAPER_DIR / topic)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    return info.get(paper_id, {}).get("pdf_url")
+
+def _lookup_pdf_url(paper_id: str) -> str:
+    import arxiv
+    # next() without a default would leak StopIteration out of to_thread and hang the caller
+    paper = next(_arxiv_client().results(arxiv.Search(id_list=[paper_id])), None)
+    if paper is None:
+        raise LookupError(f"No arXiv paper found for ID {paper_id}")
+    return paper.pdf_url
+
+@lru_cache(maxsize=1)
+def _pdf_pool() -> ProcessPoolExecutor:
+    # Created on first use, so tools that never parse PDFs don't spawn workers.
+    # Forking a process that already runs threads (to_thread, httpx) can deadlock the
+    # child, so start workers from a clean server process (spawn where unavailable).
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(
+        max_workers=min(os.cpu_count() or 1, 4),
+        mp_context=multiprocessing.get_context(method),
+    )
+
+def _extract_text(pdf_bytes: bytes) -> str:
+    import fitz  # PyMuPDF
+    # Plain-text extraction only; no image or block structures are built
+    flags = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_PRESERVE_LIGATURES | fitz.TEXT_MEDIABOX_CLIP
+    # Only the first MAX_FULL_TEXT_CHARS are returned, so stop extracting once they're filled
+    parts, total = [], 0
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for page in doc:
+            # Build the text page once and read its plain text, skipping get_text's option dispatch
+            text = page.get_textpage(flags=flags).extractText()
+            parts.append(text)
+            total += len(text) + 1
+            if total >= MAX_FULL_TEXT_CHARS:
+                break
+    return "\n".join(parts)[:MAX_FULL_TEXT_CHARS]
+
+@mcp.tool()
+async def search_extract_and_summarize(topic: str, max_results: int = 3) -> str:
+    """Search arXiv for a topic, then extract metadata and summarize each paper in one call."""
+    # The helpers are called in-process, so there is one tool round trip instead of three per paper
+    paper_ids = await asyncio.to_thread(_search_and_save, topic, max_results)
+    # Every result is saved, but only the first few are downloaded and summarized
+    papers = await asyncio.gather(*(_process_paper(pid) for pid in paper_ids[:MAX_FUSED_PAPERS]))
+    return _json_dumps({"papers": papers})
+
+async def _process_paper(paper_id: str) -> dict:
+    async with _summary_sem:
+        return await _process_paper_unlimited(paper_id)
+
+async def _process_paper_unlimited(paper_id: str) -> dict:
+    info_text, full_text = await asyncio.gather(
+        asyncio.to_thread(_extract_info, paper_id),
+        _get_full_text(paper_id)
+    )
+    # _get_full_text reports failures as text; fall back to the metadata then
+    if full_text.startswith("Failed to fetch"):
+        text_to_summarize = info_text
+    else:
+        text_to_summarize = full_text
+    try:
+        summary = await _summarize(text_to_summarize)
+    except Exception as e:
+        return {"paper_id": paper_id, "info": info_text, "error": f"summarize failed: {e}"}
+    return {"paper_id": paper_id, "info": info_text, "summary": summary}
 
 @mcp.tool()
-def list_all_papers() -> dict:
+async def list_all_papers() -> dict:
     """List all downloaded paper IDs grouped by topic."""
+    topic_dirs = await asyncio.to_thread(_topic_dirs)
+    # Read every topic's metadata concurrently instead of one file after another
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_load_topic, topic_dir) for topic_dir in topic_dirs),
+        return_exceptions=True
+    )
     topic_papers = {}
-    for subdir in Path(PAPER_DIR).iterdir():
-        if subdir.is_dir():
-            topic = subdir.name.replace("_", " ")
-            file_path = subdir / "papers_info.json"
-            if file_path.exists():
-                try:
-                    with open(file_path) as f:
-                        info = json.load(f)
-                        topic_papers[topic] = list(info.keys())
-                except Exception:
-                    topic_papers[topic] = ["Error reading metadata"]
+    for topic_dir, info in zip(topic_dirs, results):
+        topic = topic_dir.name.replace("_", " ")
+        if isinstance(info, Exception):
+            topic_papers[topic] = ["Error reading metadata"]
+        else:
+            topic_papers[topic] = list(info.keys())
     return topic_papers
 
+def _topic_dirs() -> List[Path]:
+    """Topic folders under PAPER_DIR that hold paper metadata."""
+    topic_dirs = []
+    try:
+        # scandir entries carry their file type, so is_dir() needs no extra stat()
+        with os.scandir(PAPER_DIR) as entries:
+            for entry in entries:
+                if entry.is_dir() and _topic_files(Path(entry.path)):
+                    topic_dirs.append(Path(entry.path))
+    except FileNotFoundError:
+        pass
+    return topic_dirs
+
+# Rendered folder list, reused until PAPER_DIR's mtime changes. Any search that adds papers
+# rewrites _index.json inside PAPER_DIR, which bumps that mtime.
+_folders_cache = {"mtime": None, "text": None}
+
 @mcp.resource("papers://folders")
-def get_available_folders() -> str:
+async def get_available_folders() -> str:
     """
     List all available topic folders in the papers directory.
     
     This resource provides a simple list of all available topic folders.
     """
-    folders = []
+    try:
+        mtime = os.stat(PAPER_DIR).st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    if mtime is not None and mtime == _folders_cache["mtime"]:
+        return _folders_cache["text"]
 
-    if os.path.exists(PAPER_DIR):
-        for topic_dir in os.listdir(PAPER_DIR):
-            topic_path = os.path.join(PAPER_DIR, topic_dir)
-            if os.path.isdir(topic_path):
-                papers_file = os.path.join(topic_path, "papers_info.json")
-                if os.path.exists(papers_file):
-                    folders.append(topic_dir)
+    folders = [topic_dir.name for topic_dir in await asyncio.to_thread(_topic_dirs)]
 
-    content = "# 📁 Available Topics\n\n"
+    parts = ["# 📁 Available Topics\n\n"]
     if folders:
         for folder in folders:
             display_name = folder.replace("_", " ").title()
-            content += f"- [{display_name}](papers://{folder})\n"
+            parts.append(f"- [{display_name}](papers://{folder})\n")
     else:
-        content += "_No topics found. Use the `search_papers` tool to create some._\n"
+        parts.append("_No topics found. Use the `search_papers` tool to create some._\n")
+    content = "".join(parts)
 
+    _folders_cache.update(mtime=mtime, text=content)
     return content
 
 @mcp.resource("papers://{topic}")
@@ -157,27 +532,36 @@ def get_topic_papers(topic: str) -> str:
     """
     Concise view of papers under a specific topic.
     """
-    topic_dir = topic.lower().replace(" ", "_")
-    papers_file = os.path.join(PAPER_DIR, topic_dir, "papers_info.json")
+    topic_dir = _topic_path(topic)
+    files = _topic_files(topic_dir)
 
-    if not os.path.exists(papers_file):
+    if not files:
         return f"# ❌ No papers found for topic: `{topic}`\nTry using `search_papers('{topic}')` to fetch some."
 
+    return _render_topic(topic, tuple(files))
+
+@lru_cache(maxsize=128)
+def _render_topic(topic: str, file_versions: tuple) -> str:
+    # (path, mtime_ns) pairs are the key, so any change to the topic's files renders afresh
     try:
-        with open(papers_file, "r") as f:
-            papers_data = json.load(f)
+        papers_data = {}
+        for papers_file, mtime_ns in file_versions:
+            papers_data.update(_load_json(papers_file, mtime_ns))
 
-        content = f"# 📚 Topic: {topic.replace('_', ' ').title()}\n"
-        content += f"Found {len(papers_data)} paper(s):\n\n"
+        # Collect the pieces and join once rather than growing a string with +=
+        parts = [
+            f"# 📚 Topic: {topic.replace('_', ' ').title()}\n",
+            f"Found {len(papers_data)} paper(s):\n\n"
+        ]
 
         for i, (paper_id, paper) in enumerate(papers_data.items(), 1):
-            content += f"### {i}. {paper['title']}\n"
-            content += f"- 🆔 `{paper_id}` | 🗓 {paper['published']}\n"
-            content += f"- 👥 {', '.join(paper['authors'])}\n"
-            content += f"- 🔗 [PDF]({paper['pdf_url']})\n"
-            content += f"- 📝 Summary: {paper['summary'][:200].strip()}...\n\n"
+            parts.append(f"### {i}. {paper['title']}\n")
+            parts.append(f"- 🆔 `{paper_id}` | 🗓 {paper['published']}\n")
+            parts.append(f"- 👥 {', '.join(paper['authors'])}\n")
+            parts.append(f"- 🔗 [PDF]({paper['pdf_url']})\n")
+            parts.append(f"- 📝 Summary: {paper['summary'][:200].strip()}...\n\n")
 
-        return content
+        return "".join(parts)
 
     except Exception as e:
         return f"# ⚠️ Error reading topic `{topic}`: {e}"